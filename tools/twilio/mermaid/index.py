@@ -4,20 +4,23 @@ It allows the user to perform the following actions:
 
 1. Generate a states file based on a specific trigger type of a flow.
 2. Update a mermaid graph for a flow based on the flow's states.
+3. Do both of the above in a single traversal of the flow.
 
 The tool supports the following commands:
 - `generate_states_file`: Generates a states file for a given Twilio Flow and trigger type.
 - `update_graph`: Generates a mermaid graph based on the flow's state and updates the provided output file.
+- `generate_all`: Updates the states file and the mermaid graph in the provided output file together.
 
 Required arguments:
-- `cmd`: The command to execute (either "generate_states_file" or "update_graph").
+- `cmd`: The command to execute ("generate_states_file", "update_graph" or "generate_all").
 - `trigger_type`: The trigger type of the flow.
 - `flow_sid`: The SID (identifier) of the Twilio Flow.
 
 Optional arguments:
-- `--output_file`: The path to the output mermaid graph file (used only for the update_graph command).
-- `--section_identifier`: The section identifier for the mermaid graph (used only for the update_graph command).
+- `--output_file`: The path to the output mermaid graph file (used only for the update_graph and generate_all commands).
+- `--section_identifier`: The section identifier for the mermaid graph (used only for the update_graph and generate_all commands).
 - `--flow_state_file`: The path to the state file name
+- `--no-cache`: Fetch the flow from Twilio even if a recently cached copy exists. The fetched flow still refreshes the cache.
 
 Ensure that the necessary environment variables (`TWILIO_ACCOUNT_SID` and `TWILIO_AUTH_TOKEN`) are set for authenticating with Twilio.
 
@@ -27,14 +30,20 @@ Example usage:
 
 2. To update a mermaid graph:
    python script_name.py update_graph <trigger_type> <flow_sid> --output_file <file_path> --section_identifier <section_id> -- flow_state_file <file_path>
+
+3. To update both the states file and the mermaid graph:
+   python script_name.py generate_all <trigger_type> <flow_sid> --output_file <file_path> --section_identifier <section_id> --flow_state_file <file_path>
 """
 import argparse
 import json
 import os
+import tempfile
+import time
 from enum import Enum
 
 import mermaid
 import output_states
+import traversal
 import trigger_type
 import update_doc
 import utils
@@ -44,13 +53,76 @@ from twilio.rest import Client
 TWILIO_ACCOUNT_SID = os.getenv('TWILIO_ACCOUNT_SID')
 TWILIO_AUTH_TOKEN = os.getenv('TWILIO_AUTH_TOKEN')
 
+# How long a fetched flow definition is reused from the local cache
+FLOW_CACHE_TTL_SECONDS = 300
+
+# Per-user directory for cached flow definitions, readable only by its owner
+FLOW_CACHE_DIR = os.path.join(
+    os.getenv('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'twilio_mermaid')
+
+
+def read_flow_cache(cache_path):
+    """
+    Reads a cached flow definition if it is younger than FLOW_CACHE_TTL_SECONDS.
+
+    Args:
+        cache_path (str): The path to the cached flow definition.
+
+    Returns:
+        dict: The cached flow definition, or None if it is missing, stale or unreadable.
+    """
+    try:
+        # A modification time in the future is treated as stale too
+        age = time.time() - os.path.getmtime(cache_path)
+        if not 0 <= age < FLOW_CACHE_TTL_SECONDS:
+            return None
+        with open(cache_path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"Warning: ignoring unreadable flow cache '{cache_path}': {e}")
+        return None
+
+
+def write_flow_cache(cache_path, definition):
+    """
+    Writes a flow definition to the cache. The definition is written to a
+    private temporary file first and moved over the cache file, so readers
+    never see a partially written cache.
 
-def load_twilio_flow(sid):
+    Args:
+        cache_path (str): The path to the cached flow definition.
+        definition (dict): The flow definition to cache.
+    """
+    tmp_path = None
+    try:
+        os.makedirs(os.path.dirname(cache_path), mode=0o700, exist_ok=True)
+        # mkstemp creates the file with 0600 permissions
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path), suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(definition, f)
+        os.replace(tmp_path, cache_path)
+        tmp_path = None
+    except (OSError, TypeError, ValueError) as e:
+        print(f"Warning: could not write flow cache '{cache_path}': {e}")
+    finally:
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_twilio_flow(sid, use_cache=True):
     """
     Fetch and display details of a Twilio Flow using the provided SID.
 
+    The flow definition is cached in FLOW_CACHE_DIR, and a cached copy
+    younger than FLOW_CACHE_TTL_SECONDS is returned without calling Twilio.
+    A fetched definition is always written to the cache, so later runs see
+    the latest flow even after a fetch that bypassed the cache.
+
     Args:
         sid (str): The SID of the Twilio Flow.
+        use_cache (bool): Whether to return a cached copy instead of fetching.
 
     Returns:
         dict: The definition of the Twilio Flow if found.
@@ -58,6 +130,14 @@ def load_twilio_flow(sid):
     Raises:
         Exception: If there is an error fetching the flow from Twilio.
     """
+    cache_path = os.path.join(FLOW_CACHE_DIR, f"twilio_flow_{sid}.json")
+
+    if use_cache:
+        definition = read_flow_cache(cache_path)
+        if definition is not None:
+            print(f"Flow SID: {sid} (loaded from cache {cache_path})")
+            return definition
+
     client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
 
     try:
@@ -70,10 +150,14 @@ def load_twilio_flow(sid):
         print(f"Flow Status: {flow.status}")
         print(f"Flow Date Created: {flow.date_created}")
 
-        return flow.definition
-
     except Exception as e:
         print(f"Error loading flow: {e}")
+        return None
+
+    # A failed cache write only costs a fetch on the next run
+    write_flow_cache(cache_path, flow.definition)
+
+    return flow.definition
 
 
 class Command(Enum):
@@ -83,9 +167,11 @@ class Command(Enum):
     Attributes:
         GENERATE_STATES_FILE (str): Command to generate a states file.
         UPDATE_GRAPH (str): Command to update the graph.
+        GENERATE_ALL (str): Command to update both the states file and the graph.
     """
     GENERATE_STATES_FILE = "generate_states_file"
     UPDATE_GRAPH = "update_graph"
+    GENERATE_ALL = "generate_all"
 
 
 def str_to_trigger_type(s):
@@ -144,7 +230,7 @@ def main():
     parser.add_argument(
         "cmd", type=str_to_command,
         choices=list(Command),
-        help="The command to execute (generate_states_file or update_graph)."
+        help="The command to execute (generate_states_file, update_graph or generate_all)."
     )
 
     # Required arguments
@@ -172,12 +258,16 @@ def main():
         "--flow_state_file", type=str, default="",
         help="The path to the state file name."
     )
+    parser.add_argument(
+        "--no-cache", dest="use_cache", action="store_false",
+        help="Fetch the flow from Twilio instead of using the cached definition, and refresh the cache."
+    )
 
     # Parse command-line arguments
     args = parser.parse_args()
 
     # Load the flow definition using the SID
-    flow_definition = load_twilio_flow(args.flow_sid)
+    flow_definition = load_twilio_flow(args.flow_sid, args.use_cache)
 
     if args.cmd == Command.GENERATE_STATES_FILE:
         if not args.flow_state_file:
@@ -197,8 +287,40 @@ def main():
         mermaid_graph = mermaid.generate_mermaid_graph(
             first_state, flow_definition, args.flow_state_file)
 
-        mermaid_graph = '\n'.join(mermaid_graph)
-        print(mermaid_graph)
+        print(*mermaid_graph, sep='\n')
+
+        # Update the mermaid graph in the specified output file
+        update_doc.update_mermaid_graph(
+            args.output_file, mermaid_graph, args.section_identifier)
+
+    elif args.cmd == Command.GENERATE_ALL:
+        if not args.flow_state_file or not args.section_identifier or not args.output_file:
+            raise Exception(
+                "flow_state_file, section_identifier and output_file cannot be empty for generate_all cmd")
+
+        # Leave the states file untouched rather than overwrite it with no states
+        first_state = utils.get_first_state(flow_definition, args.trigger_type)
+        if not first_state:
+            raise Exception(f"No states found for trigger type '{args.trigger_type.value}'.")
+
+        # Keep the friendly names already edited in the states file, if any.
+        # Refuse to overwrite a states file that cannot be read back.
+        friendly_states = {}
+        if os.path.exists(args.flow_state_file):
+            friendly_states = utils.load_json_object(args.flow_state_file)
+            if not isinstance(friendly_states, dict):
+                raise Exception(
+                    f"flow_state_file '{args.flow_state_file}' must contain a JSON object of friendly names")
+
+        # Collect the states and generate the mermaid graph in a single traversal
+        states, mermaid_graph = traversal.walk(
+            flow_definition, first_state, emit_states=True, emit_mermaid=True,
+            friendly_states=friendly_states)
+        if not states:
+            raise Exception(f"First state '{first_state}' not found in the flow definition.")
+        utils.write_output_to_file(states, args.flow_state_file)
+
+        print(*mermaid_graph, sep='\n')
 
         # Update the mermaid graph in the specified output file
         update_doc.update_mermaid_graph(
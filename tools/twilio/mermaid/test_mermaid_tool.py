@@ -0,0 +1,265 @@
+"""
+Tests for the file writing paths of the mermaid tool: the section splice in
+update_doc, the flow definition cache and the generate_all command.
+
+Run from this directory with:
+    python -m unittest test_mermaid_tool
+"""
+import contextlib
+import io
+import json
+import os
+import stat
+import sys
+import tempfile
+import time
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import index
+import update_doc
+
+FLOW_DEFINITION = {
+    "states": [
+        {"name": "Trigger", "type": "trigger", "transitions": [
+            {"event": "incomingRequest", "next": "call_user"},
+        ]},
+        {"name": "call_user", "type": "connect-call-to", "transitions": [
+            {"event": "answered", "next": "split_answered_by"},
+            {"event": "failed", "next": "http_call_no_answer"},
+        ]},
+        {"name": "split_answered_by", "type": "split-based-on", "transitions": [
+            {"event": "noMatch"},
+            {"event": "match", "next": "http_call_no_answer",
+             "conditions": [{"friendly_name": "machine"}]},
+        ]},
+        {"name": "http_call_no_answer", "type": "make-http-request", "transitions": []},
+    ]
+}
+
+DOC_CONTENT = """# Doc
+
+<!-- my-section-start -->
+old graph
+<!-- my-section-end -->
+trailer
+"""
+
+
+def quietly(func, *args, **kwargs):
+    """Calls func with its printed output discarded."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+class UpdateMermaidGraphTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.doc = os.path.join(self.tmp_dir.name, "doc.md")
+        with open(self.doc, 'w') as f:
+            f.write(DOC_CONTENT)
+
+    def read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def test_replaces_section_from_string(self):
+        update_doc.update_mermaid_graph(self.doc, "A\nB", "my-section")
+        self.assertEqual(
+            self.read(self.doc),
+            "# Doc\n\n<!-- my-section-start -->\nA\nB\n<!-- my-section-end -->\ntrailer\n")
+
+    def test_list_and_string_give_same_content(self):
+        update_doc.update_mermaid_graph(self.doc, ["A", "B"], "my-section")
+        from_list = self.read(self.doc)
+        with open(self.doc, 'w') as f:
+            f.write(DOC_CONTENT)
+        update_doc.update_mermaid_graph(self.doc, "A\nB", "my-section")
+        self.assertEqual(from_list, self.read(self.doc))
+
+    def test_missing_section_leaves_file_unchanged(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            update_doc.update_mermaid_graph(self.doc, "A", "other-section")
+        self.assertIn("Section 'other-section' not found", output.getvalue())
+        self.assertEqual(self.read(self.doc), DOC_CONTENT)
+
+    def test_keeps_mode_and_existing_tmp_file(self):
+        os.chmod(self.doc, 0o640)
+        user_tmp = f"{self.doc}.tmp"
+        with open(user_tmp, 'w') as f:
+            f.write("user data")
+
+        update_doc.update_mermaid_graph(self.doc, "A", "my-section")
+
+        self.assertEqual(stat.S_IMODE(os.stat(self.doc).st_mode), 0o640)
+        self.assertEqual(self.read(user_tmp), "user data")
+        self.assertEqual(sorted(os.listdir(self.tmp_dir.name)), ["doc.md", "doc.md.tmp"])
+
+    def test_writes_through_symlink(self):
+        link = os.path.join(self.tmp_dir.name, "link.md")
+        os.symlink(self.doc, link)
+
+        update_doc.update_mermaid_graph(link, "A", "my-section")
+
+        self.assertTrue(os.path.islink(link))
+        self.assertIn("\nA\n", self.read(self.doc))
+
+    def test_failed_write_leaves_no_temp_file(self):
+        def failing_lines():
+            yield "A"
+            raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            update_doc.update_mermaid_graph(self.doc, failing_lines(), "my-section")
+
+        self.assertEqual(self.read(self.doc), DOC_CONTENT)
+        self.assertEqual(os.listdir(self.tmp_dir.name), ["doc.md"])
+
+
+class FlowCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        cache_dir = os.path.join(self.tmp_dir.name, "cache")
+        patcher = mock.patch.object(index, "FLOW_CACHE_DIR", cache_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache_path = os.path.join(cache_dir, "twilio_flow_FW1.json")
+
+    def mock_client(self, definition=FLOW_DEFINITION, error=None):
+        """Patches the Twilio client to return the given flow definition."""
+        flow = SimpleNamespace(
+            sid="FW1", friendly_name="flow", status="published",
+            date_created="now", definition=definition)
+        fetch = mock.Mock(return_value=flow, side_effect=error)
+        client = mock.Mock()
+        client.studio.v2.flows.return_value.fetch = fetch
+        patcher = mock.patch.object(index, "Client", return_value=client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return fetch
+
+    def write_cache(self, definition, age=0):
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        with open(self.cache_path, 'w') as f:
+            json.dump(definition, f)
+        mtime = time.time() - age
+        os.utime(self.cache_path, (mtime, mtime))
+
+    def test_fetch_writes_private_cache(self):
+        self.mock_client()
+        self.assertEqual(quietly(index.load_twilio_flow, "FW1"), FLOW_DEFINITION)
+        self.assertEqual(stat.S_IMODE(os.stat(self.cache_path).st_mode), 0o600)
+        self.assertEqual(index.read_flow_cache(self.cache_path), FLOW_DEFINITION)
+
+    def test_fresh_cache_skips_fetch(self):
+        fetch = self.mock_client()
+        self.write_cache({"states": []})
+        self.assertEqual(quietly(index.load_twilio_flow, "FW1"), {"states": []})
+        fetch.assert_not_called()
+
+    def test_stale_or_future_cache_is_ignored(self):
+        for age in (index.FLOW_CACHE_TTL_SECONDS + 1, -3600):
+            self.write_cache({"states": []}, age=age)
+            self.assertIsNone(index.read_flow_cache(self.cache_path))
+
+    def test_truncated_cache_is_fetched_again(self):
+        self.mock_client()
+        os.makedirs(os.path.dirname(self.cache_path))
+        with open(self.cache_path, 'w') as f:
+            f.write('{"sta')
+        self.assertEqual(quietly(index.load_twilio_flow, "FW1"), FLOW_DEFINITION)
+        self.assertEqual(index.read_flow_cache(self.cache_path), FLOW_DEFINITION)
+
+    def test_no_cache_fetches_and_refreshes_cache(self):
+        fetch = self.mock_client()
+        self.write_cache({"states": []})
+        self.assertEqual(
+            quietly(index.load_twilio_flow, "FW1", use_cache=False), FLOW_DEFINITION)
+        fetch.assert_called_once()
+        self.assertEqual(index.read_flow_cache(self.cache_path), FLOW_DEFINITION)
+
+    def test_failed_cache_write_still_returns_flow(self):
+        self.mock_client()
+        with mock.patch.object(index.tempfile, "mkstemp", side_effect=OSError("read-only")):
+            self.assertEqual(quietly(index.load_twilio_flow, "FW1"), FLOW_DEFINITION)
+        self.assertFalse(os.path.exists(self.cache_path))
+
+    def test_failed_fetch_returns_none(self):
+        self.mock_client(error=RuntimeError("network down"))
+        self.assertIsNone(quietly(index.load_twilio_flow, "FW1"))
+
+
+class GenerateAllTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.doc = os.path.join(self.tmp_dir.name, "doc.md")
+        with open(self.doc, 'w') as f:
+            f.write(DOC_CONTENT)
+        self.states_file = os.path.join(self.tmp_dir.name, "states.json")
+        patcher = mock.patch.object(index, "load_twilio_flow", return_value=FLOW_DEFINITION)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_main(self, trigger="rest_api"):
+        argv = ["index.py", "generate_all", trigger, "FW1",
+                "--output_file", self.doc, "--section_identifier", "my-section",
+                "--flow_state_file", self.states_file]
+        with mock.patch.object(sys, "argv", argv):
+            quietly(index.main)
+
+    def write_states(self, content):
+        with open(self.states_file, 'w') as f:
+            f.write(content)
+
+    def read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def test_keeps_friendly_names_and_updates_graph(self):
+        self.write_states('{"call_user": "Call the user"}')
+        self.run_main()
+
+        with open(self.states_file) as f:
+            self.assertEqual(json.load(f), {
+                "call_user": "Call the user",
+                "split_answered_by": "split_answered_by",
+                "http_call_no_answer": "http_call_no_answer",
+            })
+        doc = self.read(self.doc)
+        self.assertIn("    call_user(Call the user)\n", doc)
+        self.assertIn("    split_answered_by{split_answered_by}\n", doc)
+        self.assertIn("    linkStyle 1 stroke:red\n", doc)
+        self.assertNotIn("old graph", doc)
+
+    def test_creates_states_file(self):
+        self.run_main()
+        with open(self.states_file) as f:
+            self.assertEqual(list(json.load(f)), [
+                "call_user", "split_answered_by", "http_call_no_answer"])
+
+    def test_unknown_trigger_leaves_files_untouched(self):
+        self.write_states('{"call_user": "Call the user"}')
+        with self.assertRaisesRegex(Exception, "No states found"):
+            self.run_main(trigger="incoming_call")
+        self.assertEqual(self.read(self.states_file), '{"call_user": "Call the user"}')
+        self.assertEqual(self.read(self.doc), DOC_CONTENT)
+
+    def test_unreadable_states_file_is_not_overwritten(self):
+        for content in ('{"call_user": "Call the user",}', '["call_user"]'):
+            self.write_states(content)
+            with self.assertRaisesRegex(Exception, "must contain a JSON object"):
+                self.run_main()
+            self.assertEqual(self.read(self.states_file), content)
+            self.assertEqual(self.read(self.doc), DOC_CONTENT)
+
+
+if __name__ == "__main__":
+    unittest.main()
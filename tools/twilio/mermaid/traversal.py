@@ -0,0 +1,119 @@
+"""
+Module: flow_traversal
+
+This module provides a single depth-first traversal of the states of a
+Twilio flow definition. The same pass can collect the reachable states and
+build the Mermaid graph for them, so commands producing both artifacts only
+walk the flow once.
+
+Key Functionality:
+- Maps every state reachable from the initial state to its friendly name.
+- Emits the Mermaid node and link lines for every reachable state.
+
+Example Usage:
+    flow_definition = {...}  # JSON representation of a Twilio flow
+    initial_state = utils.get_first_state(flow_definition, trigger_type)
+    states, graph_parts = walk(flow_definition, initial_state, emit_mermaid=True)
+"""
+
+# Transition events whose links are styled in red
+_RED_EVENTS = frozenset(("failed", "timeout"))
+
+
+def walk(flow_definition, initial_state, emit_states=True, emit_mermaid=False,
+         friendly_states=None):
+    """
+    Traverses the states reachable from the initial state and builds the
+    requested outputs.
+
+    Args:
+        flow_definition (dict): The JSON representation of the Twilio flow.
+        initial_state (str): The starting state for the flow.
+        emit_states (bool): Whether to collect the reachable states.
+        emit_mermaid (bool): Whether to build the Mermaid graph.
+        friendly_states (dict or None): Friendly names keyed by state name (optional).
+
+    Returns:
+        tuple: A dictionary mapping state names to their friendly names, and a
+        list of strings that represents the Mermaid graph syntax. Each one is
+        None if it was not requested.
+    """
+    if friendly_states is None:
+        friendly_states = {}
+
+    all_states = {} if emit_states else None
+
+    # Initialize the Mermaid graph
+    graph_parts = ['```mermaid', 'flowchart TD'] if emit_mermaid else None
+    # Bind the append method once, it is called for every node and link
+    _append = graph_parts.append if emit_mermaid else None
+
+    # Create a mapping of state names to state definitions
+    state_map = {state['name']: state for state in flow_definition['states']}
+    visited_states = set()
+    link_index = -1
+
+    # Traverse the states depth-first with an explicit stack, so deep flows
+    # do not hit the interpreter's recursion limit. States are marked as
+    # visited when pushed, so each state is only ever pushed once.
+    valid_names = state_map.keys()
+    stack = []
+    if initial_state in valid_names:
+        visited_states.add(initial_state)
+        stack.append(initial_state)
+
+    while stack:
+        state_name = stack.pop()
+        state = state_map[state_name]
+        transitions = state.get('transitions', [])
+
+        # Determine the friendly name for the state
+        friendly_name = friendly_states.get(state_name, state_name)
+
+        if emit_states:
+            all_states[state_name] = friendly_name
+
+        if emit_mermaid:
+            # Add node for the current state based on its type
+            is_split = state.get('type') == 'split-based-on'
+            if is_split:
+                _append(f'    {state_name}{{{friendly_name}}}')
+            else:
+                _append(f'    {state_name}({friendly_name})')
+
+            # Add links for the transitions from the current state
+            for transition in transitions:
+                next_state = transition.get('next')
+                if not next_state:
+                    continue
+
+                link_index += 1
+                event = transition.get('event')
+                conditions = transition.get('conditions')
+
+                # Add condition if available, otherwise use the event value
+                if conditions:
+                    condition = conditions[0].get('friendly_name')
+                    _append(f'    {state_name} --> |{condition}| {next_state}')
+                    continue
+
+                if event != 'next':
+                    _append(f'    {state_name} --> |{event}| {next_state}')
+                else:
+                    _append(f'    {state_name} --> {next_state}')
+
+                # Style failed links with a red color
+                if event in _RED_EVENTS:
+                    _append(f'    linkStyle {link_index} stroke:red')
+
+        # Push the next states in reverse so they are visited in transition order
+        for transition in reversed(transitions):
+            next_state = transition.get('next')
+            if next_state in valid_names and next_state not in visited_states:
+                visited_states.add(next_state)
+                stack.append(next_state)
+
+    if emit_mermaid:
+        _append('```')
+
+    return all_states, graph_parts
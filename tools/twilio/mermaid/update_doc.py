@@ -7,13 +7,15 @@ Mermaid graph section identified by custom tags and writes the updated
 content back to the file.
 
 Key Functionality:
-- Reads a file's content and identifies a Mermaid graph section using
+- Reads a file's content and locates a Mermaid graph section by its
   start and end tags.
-- Replaces the identified section with a new Mermaid graph.
+- Replaces the identified section with a new Mermaid graph, given as a
+  string or as a list of lines.
 - Handles errors gracefully, such as missing files.
 
 Dependencies:
-- Regular expressions (re) for pattern matching and section replacement.
+- `os`, `shutil` and `tempfile` for atomically replacing the file with its
+  updated content while keeping its permissions.
 
 Example Usage:
     filename = "example.md"
@@ -22,7 +24,10 @@ Example Usage:
     update_mermaid_graph(filename, new_graph, section_identifier)
 """
 
-import re
+import os
+import shutil
+import tempfile
+
 
 def update_mermaid_graph(filename, new_graph, section_identifier):
     """
@@ -31,7 +36,8 @@ def update_mermaid_graph(filename, new_graph, section_identifier):
 
     Args:
         filename (str): The name of the file to be modified.
-        new_graph (str): The new mermaid graph to insert into the section.
+        new_graph (str or iterable of str): The new mermaid graph to insert into the
+            section, either as a single string or as its lines.
         section_identifier (str): A custom identifier for locating the section to be replaced.
 
     Raises:
@@ -46,20 +52,38 @@ def update_mermaid_graph(filename, new_graph, section_identifier):
         mermaid_start_tag = f"<!-- {section_identifier}-start -->"
         mermaid_end_tag = f"<!-- {section_identifier}-end -->"
 
-        # Build the regex pattern dynamically using the tags
-        regex_pattern = fr"{re.escape(mermaid_start_tag)}\s*(.*?)\s*{re.escape(mermaid_end_tag)}"
+        # Locate the section by its literal tags
+        start = content.find(mermaid_start_tag)
+        end = content.find(mermaid_end_tag, start)
+        if start < 0 or end < 0:
+            print(f"Error: Section '{section_identifier}' not found in '{filename}'.")
+            return
+
+        graph_lines = (new_graph,) if isinstance(new_graph, str) else new_graph
 
-        # Replace the old Mermaid graph section with the new graph
-        updated_content = re.sub(
-            regex_pattern,
-            f"{mermaid_start_tag}\n{new_graph}\n{mermaid_end_tag}",
-            content,
-            flags=re.DOTALL
-        )
+        # Write the new Mermaid graph in place of the old section, piece by piece
+        # rather than building the whole updated content in memory. Write to a
+        # temporary file first, so the file is never left half written, and
+        # replace the real file so a symlinked document keeps its link.
+        target = os.path.realpath(filename)
+        fd, tmp_filename = tempfile.mkstemp(
+            dir=os.path.dirname(target), prefix=f".{os.path.basename(target)}.", suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(content[:start])
+                f.write(f"{mermaid_start_tag}\n")
+                for line in graph_lines:
+                    f.write(f"{line}\n")
+                f.write(mermaid_end_tag)
+                f.write(content[end + len(mermaid_end_tag):])
 
-        # Write the updated content back to the file
-        with open(filename, 'w') as f:
-            f.write(updated_content)
+            # Keep the permissions of the original file
+            shutil.copymode(target, tmp_filename)
+            os.replace(tmp_filename, target)
+        finally:
+            # Only left behind if writing or replacing failed
+            if os.path.exists(tmp_filename):
+                os.remove(tmp_filename)
 
     except FileNotFoundError:
         print(f"Error: File '{filename}' not found.")
@@ -10,11 +10,12 @@ def write_output_to_file(output, output_file):
         output (json object or list): A json object or list.
         output_file (str): The file path to save the output as JSON.
     """
-    with open(output_file, 'w') as file:
+    # Serialize in memory and issue a single write for the whole output
+    with open(output_file, 'w', buffering=1 << 20) as file:
         if isinstance(output, dict):
-            json.dump(output, file, indent=4)
+            file.write(json.dumps(output, indent=4))
         else:
-            file.writelines(f"{line}\n" for line in output)
+            file.write(''.join(f"{line}\n" for line in output))
 
     print(f"Output written to {output_file}.")
 
@@ -30,26 +31,18 @@ def get_first_state(flow_definition, trigger_type):
     Returns:
         dict: the first state for the trigger.
     """
-    # Find the trigger state
-    trigger_state = {"transitions": {}}
-
     #  Find the trigger state
-    for state in flow_definition['states']:
-        if state['type'] == 'trigger':
-            trigger_state = state
-            break
-
-    first_state = None
-
-    # Loop through all states in the flow definition to locate the first
-    for transition in trigger_state.get('transitions', []):
-        event = transition.get('event')
-        next_state = transition.get('next')
-        if event == trigger_type.value:
-            first_state = next_state
-            break
+    trigger_state = next(
+        (state for state in flow_definition['states'] if state['type'] == 'trigger'),
+        {"transitions": []}
+    )
 
-    return first_state
+    # Find the first transition of the trigger for the requested event
+    return next(
+        (transition.get('next') for transition in trigger_state.get('transitions', [])
+         if transition.get('event') == trigger_type.value),
+        None
+    )
 
 def load_json_object(file_path):
     """
@@ -62,7 +55,8 @@ def load_json_object(file_path):
         dict: The JSON object loaded as a Python dictionary, or None if an error occurs.
     """
     try:
-        with open(file_path, 'r') as file:
+        # A large read buffer keeps the number of read calls low for big files
+        with open(file_path, 'r', buffering=1 << 20) as file:
             data = json.load(file)  # Parse the JSON file into a Python dictionary
         return data
     except FileNotFoundError: